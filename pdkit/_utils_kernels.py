@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright 2018 Birkbeck College. All rights reserved.
+#
+# Licensed under the MIT license. See file LICENSE for details.
+#
+# Author(s): J.S. Pons, Cosmin Stamate
+
+"""
+    Hot loops behind :func:`pdkit.utils.peakdet` and :func:`pdkit.utils.magnitude`.
+
+    The functions are plain Python so they can be compiled two ways: ahead of time into the optional
+    `pdkit.pdkit_kernels` extension module (built with `make kernels`, which runs this file), or just in time by
+    :mod:`pdkit.utils` when that extension is not available.
+"""
+
+import numpy as np
+
+from numba import prange
+
+
+PEAKDET_SIGNATURE = 'UniTuple(f8[:, :], 2)(f8[:], f8)'
+MAGNITUDE_SIGNATURE = 'void(f8[:, :], f8[:])'
+
+
+def peakdet(v, delta):
+    """
+        Core of :func:`pdkit.utils.peakdet`. Writes the (index, value) pairs of the maxima and minima found in `v`
+        straight into pre-sized float64 tables and returns the filled rows.
+    """
+    n = v.shape[0]
+    maxtab = np.empty((n, 2))
+    mintab = np.empty((n, 2))
+    n_max = 0
+    n_min = 0
+
+    mn, mx = np.inf, -np.inf
+    mnpos, mxpos = 0, 0
+
+    lookformax = True
+
+    for i in range(n):
+        this = v[i]
+        if this > mx:
+            mx = this
+            mxpos = i
+        if this < mn:
+            mn = this
+            mnpos = i
+
+        if lookformax:
+            if this < mx - delta:
+                maxtab[n_max, 0] = mxpos
+                maxtab[n_max, 1] = mx
+                n_max += 1
+                mn = this
+                mnpos = i
+                lookformax = False
+        else:
+            if this > mn + delta:
+                mintab[n_min, 0] = mnpos
+                mintab[n_min, 1] = mn
+                n_min += 1
+                mx = this
+                mxpos = i
+                lookformax = True
+
+    # copy the filled rows so the n sized tables can be released
+    return maxtab[:n_max].copy(), mintab[:n_min].copy()
+
+
+def magnitude(xyz, out):
+    """
+        Core of :func:`pdkit.utils.magnitude`. Reads one row and writes one value per iteration, so no temporary
+        arrays are allocated.
+    """
+    for i in prange(xyz.shape[0]):
+        out[i] = np.sqrt(xyz[i, 0] ** 2 + xyz[i, 1] ** 2 + xyz[i, 2] ** 2)
+
+
+def build_module():
+    """
+        Set up the numba ahead-of-time compiler for the `pdkit_kernels` extension module.
+
+        :return: The compiler, call `compile()` on it to build the module next to this file.
+        :rtype: numba.pycc.CC
+    """
+    from numba.pycc import CC
+
+    cc = CC('pdkit_kernels')
+    cc.export('peakdet_f64', PEAKDET_SIGNATURE)(peakdet)
+    cc.export('magnitude_f64', MAGNITUDE_SIGNATURE)(magnitude)
+
+    return cc
+
+
+if __name__ == '__main__':
+    build_module().compile()
@@ -12,7 +12,7 @@ import pandas as pd
 
 from scipy import interpolate, signal, fft
 
-from .utils import get_sampling_rate_from_timestamp, butter_lowpass_filter
+from .utils import get_sampling_rate_from_timestamp, batch_butter_lowpass_filter
 
 class Processor:
     """
@@ -98,18 +98,27 @@ class Processor:
     
     def filter_data_frame(self, data_frame, centre=False, keep_cols=['anno']):
         """
-            This method filters a data frame signal as suggested in [1]. First step is to high pass filter the data
-            frame using a butter Butterworth digital and analog filter 
-            (https://docs.scipy.org/doc/scipy-0.14.0/reference/generated/scipy.signal.butter.html). Then the method 
-            filter the data frame along one-dimension using a digital filter. 
-            (https://docs.scipy.org/doc/scipy/reference/generated/scipy.signal.lfilter.html)
+            This method filters a data frame signal as suggested in [1]. Every column is low pass filtered with the
+            [filter_order]th order Butterworth filter whose cut frequency is set to [cutoff_frequency] Hz
+            (https://docs.scipy.org/doc/scipy/reference/generated/scipy.signal.butter.html), designed as second-order
+            sections. The columns are filtered all at once by :func:`pdkit.utils.batch_butter_lowpass_filter`, a
+            numba compiled second-order sections kernel that gives the same result as scipy.signal.sosfilt on each
+            column of `data_frame.values`, so every column is cast to float64. The keep_cols are copied back
+            unfiltered.
 
-            :param data_frame: the data frame    
-            :param str cutoff_frequency: The path to load data from
-            :param str filter_order: format of the file. Default is CloudUPDRS. Set to mpower for mpower data.
+            :param data_frame: the data frame
+            :type data_frame: pandas.DataFrame
+            :param centre: de-mean the filtered columns and zero them up to their first positive value
+            :type centre: bool
+            :param keep_cols: columns to copy back from the original data frame
+            :type keep_cols: list
+            :return: the filtered data frame, or None if a column in keep_cols is missing
+            :rtype: pandas.DataFrame
         """        
-        b_f = lambda x: butter_lowpass_filter(x.values, self.sampling_frequency, cutoff=self.cutoff_frequency, order=self.filter_order)
-        filtered_data_frame = data_frame.apply(b_f, 0)
+        # filter all the columns at once, one channel per row
+        filtered = batch_butter_lowpass_filter(data_frame.values.T, self.sampling_frequency,
+                                               cutoff=self.cutoff_frequency, order=self.filter_order)
+        filtered_data_frame = pd.DataFrame(filtered.T, index=data_frame.index, columns=data_frame.columns)
         
         # we don't need to filter the time difference
         # filtered_data_frame.td = data_frame.td
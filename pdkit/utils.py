@@ -6,22 +6,189 @@
 #
 # Author(s): J.S. Pons, Cosmin Stamate
 
+import io
 import sys
 import re
 import logging
+import functools
 
 import pandas as pd
 import numpy as np
+import orjson
 
+from numba import njit, prange
 from scipy.fftpack import rfft, fftfreq
-from scipy.signal import butter, lfilter, correlate, freqz
+from scipy.signal import butter, sosfilt, sosfilt_zi, sosfreqz, correlate
 
 import matplotlib.pylab as plt
 
 import scipy.signal as sig
+import scipy.fft as spfft
 from numpy import array
 from scipy.spatial.distance import euclidean
 
+from . import _utils_kernels
+
+# Use the ahead-of-time compiled kernels when the extension was built (see _utils_kernels.py), so short-lived
+# processes skip the JIT warm-up. Otherwise compile the same kernels on first call.
+try:
+    from . import pdkit_kernels
+except ImportError:
+    pdkit_kernels = None
+
+if pdkit_kernels is not None:
+    _peakdet_nb = pdkit_kernels.peakdet_f64
+    _magnitude_nb = pdkit_kernels.magnitude_f64
+else:
+    _peakdet_nb = njit(cache=True)(_utils_kernels.peakdet)
+    _magnitude_nb = njit(cache=True, parallel=True)(_utils_kernels.magnitude)
+
+
+def magnitude(xyz, out=None):
+    """
+        Compute the magnitude (euclidean norm) of each row of an (n, 3) array of x, y, z components.
+
+        :param xyz: The x, y, z components, one sample per row.
+        :type xyz: numpy.ndarray
+        :param out: Optional float64 array of length n to write the result into.
+        :type out: numpy.ndarray
+        :return: The magnitude of each sample.
+        :rtype: numpy.ndarray
+    """
+    xyz = np.asarray(xyz, dtype=np.float64)
+    if out is None:
+        out = np.empty(xyz.shape[0])
+    _magnitude_nb(xyz, out)
+
+    return out
+
+
+def batch_magnitude(xyz_batch):
+    """
+        Compute the magnitude of many accelerometer channels at once, in parallel across channels.
+
+        :param xyz_batch: The x, y, z components of each channel, shaped (channels, 3, n).
+        :type xyz_batch: numpy.ndarray
+        :return: The magnitude of each sample of each channel, shaped (channels, n).
+        :rtype: numpy.ndarray
+    """
+    xyz_batch = np.asarray(xyz_batch, dtype=np.float64)
+    out = np.empty((xyz_batch.shape[0], xyz_batch.shape[2]))
+    _batch_magnitude_nb(xyz_batch, out)
+
+    return out
+
+
+@njit(cache=True, parallel=True)
+def _batch_magnitude_nb(xyz_batch, out):
+    """
+        Compiled core of :func:`batch_magnitude`, one channel per thread.
+    """
+    for c in prange(xyz_batch.shape[0]):
+        for i in range(xyz_batch.shape[2]):
+            out[c, i] = np.sqrt(xyz_batch[c, 0, i] ** 2 + xyz_batch[c, 1, i] ** 2 + xyz_batch[c, 2, i] ** 2)
+
+
+def acceleration_data_frame(time_difference, xyz, date_times):
+    """
+        Build the td, x, y, z, mag_sum_acc data frame returned by the accelerometer loaders.
+
+        The columns are written into a single (n, 5) float64 block that is handed to pandas without copying, instead
+        of building a frame from a dict of separate columns.
+
+        :param time_difference: Time since the first sample.
+        :type time_difference: numpy.ndarray
+        :param xyz: The x, y, z components of the acceleration, one sample per row.
+        :type xyz: numpy.ndarray
+        :param date_times: The index of the data frame.
+        :type date_times: pandas.DatetimeIndex
+        :return: The accelerometer data frame.
+        :rtype: pandas.DataFrame
+    """
+    data = np.empty((len(time_difference), 5))
+    data[:, 0] = time_difference
+    data[:, 1:4] = xyz
+    magnitude(data[:, 1:4], out=data[:, 4])
+
+    return pd.DataFrame(data, index=date_times, columns=['td', 'x', 'y', 'z', 'mag_sum_acc'], copy=False)
+
+
+def nanoseconds_to_datetime_index(offsets):
+    """
+        Turn offsets in nanoseconds into a datetime index (starting from the epoch) by viewing them as datetime64[ns],
+        which avoids the unit inference done by :func:`pandas.to_datetime`. Fractional nanoseconds are truncated and
+        NaN offsets (e.g. empty time fields) become NaT, as with :func:`pandas.to_datetime`.
+
+        :param offsets: Time offsets in nanoseconds.
+        :type offsets: numpy.ndarray
+        :return: The datetime index.
+        :rtype: pandas.DatetimeIndex
+    """
+    offsets = np.asarray(offsets)
+    if offsets.dtype.kind == 'f':
+        finite = np.isfinite(offsets)
+        if not finite.all():
+            # casting NaN to int64 is platform dependent, so set NaT (the smallest int64) explicitly
+            nanoseconds = np.where(finite, offsets, 0).astype(np.int64)
+            nanoseconds[~finite] = np.iinfo(np.int64).min
+            return pd.DatetimeIndex(nanoseconds.view('datetime64[ns]'))
+
+    return pd.DatetimeIndex(offsets.astype(np.int64).view('datetime64[ns]'))
+
+
+def read_csv_data(filename):
+    """
+        Read a headerless comma separated file of numbers into a float64 array using the pandas C parser.
+
+        Lines with a different number of fields than the first line are skipped and empty fields are read as NaN, as
+        with :func:`numpy.genfromtxt` and ``invalid_raise=False``. Files with non-numeric fields are handed to
+        :func:`numpy.genfromtxt` itself.
+
+        :param filename: The path to load data from
+        :type filename: string
+        :return: The parsed data, one row per line.
+        :rtype: numpy.ndarray
+    """
+    with open(filename, 'rb') as f:
+        raw = f.read()
+
+    skip = _lines_to_skip(raw)
+    if skip is not None:
+        try:
+            data_frame = pd.read_csv(io.BytesIO(raw), header=None, dtype=np.float64, engine='c', skiprows=skip)
+            # genfromtxt squeezes single row and single column results too
+            return np.squeeze(data_frame.to_numpy())
+        except ValueError:
+            pass
+
+    return np.genfromtxt(io.BytesIO(raw), delimiter=',', invalid_raise=False)
+
+
+def _lines_to_skip(raw):
+    """
+        Indices of the blank lines in `raw` and of the lines whose number of comma separated fields differs from the
+        first non-blank line, or None if there are no non-blank lines.
+    """
+    buf = np.frombuffer(raw, dtype=np.uint8)
+    ends = np.flatnonzero(buf == ord('\n'))
+    if buf.size and buf[-1] != ord('\n'):
+        ends = np.append(ends, buf.size)
+
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts
+    # a lone carriage return is a blank line too
+    blank = (lengths == 0) | ((lengths == 1) & (buf[np.minimum(starts, buf.size - 1)] == ord('\r')))
+
+    fields = np.bincount(np.searchsorted(ends, np.flatnonzero(buf == ord(','))), minlength=ends.size) + 1
+
+    first = np.flatnonzero(~blank)
+    if first.size == 0:
+        return None
+
+    return np.flatnonzero(blank | (fields != fields[first[0]])).tolist()
+
 
 def load_cloudupdrs_data(filename, convert_times=1000000000.0):
     """
@@ -46,22 +213,17 @@ def load_cloudupdrs_data(filename, convert_times=1000000000.0):
       :param convert_times: Convert times. The default is from from nanoseconds to seconds.
       :type convert_times: float
     """
-    # data_m = pd.read_table(filename, sep=',', header=None)
     try:
-        data_m = np.genfromtxt(filename, delimiter=',', invalid_raise=False)
-        date_times = pd.to_datetime((data_m[:, 0] - data_m[0, 0]))
+        data_m = read_csv_data(filename)
+        date_times = nanoseconds_to_datetime_index(data_m[:, 0] - data_m[0, 0])
         time_difference = (data_m[:, 0] - data_m[0, 0]) / convert_times
-        magnitude_sum_acceleration = \
-            np.sqrt(data_m[:, 1] ** 2 + data_m[:, 2] ** 2 + data_m[:, 3] ** 2)
-        data = {'td': time_difference, 'x': data_m[:, 1], 'y': data_m[:, 2], 'z': data_m[:, 3],
-                'mag_sum_acc': magnitude_sum_acceleration}
-        data_frame = pd.DataFrame(data, index=date_times, columns=['td', 'x', 'y', 'z', 'mag_sum_acc'])
+        data_frame = acceleration_data_frame(time_difference, data_m[:, 1:4], date_times)
         return data_frame
     except IOError as e:
         ierr = "({}): {}".format(e.errno, e.strerror)
         logging.error("load data, file not found, I/O error %s", ierr)
     except ValueError as verr:
-        logging.error("load data ValueError ->%s", verr.message)
+        logging.error("load data ValueError ->%s", verr)
     except:
         logging.error("Unexpected error on load data method: %s", sys.exc_info()[0])
 
@@ -88,23 +250,18 @@ def load_opdc_data(filename, convert_times=1000000000.0):
       :param convert_times: Convert times. The default is from from nanoseconds to seconds.
       :type convert_times: float
     """
-    # data_m = pd.read_table(filename, sep=',', header=None)
     try:
-        data_m = np.genfromtxt(filename, delimiter=',', invalid_raise=False)
+        data_m = read_csv_data(filename)
         data_m[:, 0] = data_m[:, 0] * 1000000000
-        date_times = pd.to_datetime((data_m[:, 0] - data_m[0, 0]))
+        date_times = nanoseconds_to_datetime_index(data_m[:, 0] - data_m[0, 0])
         time_difference = (data_m[:, 0] - data_m[0, 0]) / convert_times
-        magnitude_sum_acceleration = \
-            np.sqrt(data_m[:, 1] ** 2 + data_m[:, 2] ** 2 + data_m[:, 3] ** 2)
-        data = {'td': time_difference, 'x': data_m[:, 1], 'y': data_m[:, 2], 'z': data_m[:, 3],
-                'mag_sum_acc': magnitude_sum_acceleration}
-        data_frame = pd.DataFrame(data, index=date_times, columns=['td', 'x', 'y', 'z', 'mag_sum_acc'])
+        data_frame = acceleration_data_frame(time_difference, data_m[:, 1:4], date_times)
         return data_frame
     except IOError as e:
         ierr = "({}): {}".format(e.errno, e.strerror)
         logging.error("load data, file not found, I/O error %s", ierr)
     except ValueError as verr:
-        logging.error("load data ValueError ->%s", verr.message)
+        logging.error("load data ValueError ->%s", verr)
     except:
         logging.error("Unexpected error on load data method: %s", sys.exc_info()[0])
 
@@ -238,15 +395,19 @@ def load_mpower_data(filename, convert_times=1000000000.0):
         :param convert_times: Convert times. The default is from from nanoseconds to seconds.
         :type convert_times: float
     """
-    raw_data = pd.read_json(filename)
-    date_times = pd.to_datetime(raw_data.timestamp * convert_times - raw_data.timestamp[0] * convert_times)
-    time_difference = (raw_data.timestamp - raw_data.timestamp[0])
-    time_difference = time_difference.values
-    magnitude_sum_acceleration = \
-        np.sqrt(raw_data.x.values ** 2 + raw_data.y.values ** 2 + raw_data.z.values ** 2)
-    data = {'td': time_difference, 'x': raw_data.x.values, 'y': raw_data.y.values,
-            'z': raw_data.z.values, 'mag_sum_acc': magnitude_sum_acceleration}
-    data_frame = pd.DataFrame(data, index=date_times, columns=['td', 'x', 'y', 'z', 'mag_sum_acc'])
+    with open(filename, 'rb') as f:
+        records = orjson.loads(f.read())
+
+    n = len(records)
+    timestamp = np.fromiter((record['timestamp'] for record in records), dtype=np.float64, count=n)
+    xyz = np.empty((n, 3))
+    for i, axis in enumerate(['x', 'y', 'z']):
+        xyz[:, i] = np.fromiter((record[axis] for record in records), dtype=np.float64, count=n)
+
+    date_times = nanoseconds_to_datetime_index(timestamp * convert_times - timestamp[0] * convert_times)
+    date_times.name = 'timestamp'
+    time_difference = (timestamp - timestamp[0])
+    data_frame = acceleration_data_frame(time_difference, xyz, date_times)
     return data_frame
 
 
@@ -276,7 +437,7 @@ def load_finger_tapping_cloudupdrs_data(filename, convert_times=1000.0):
 
     """
     data_m = np.genfromtxt(filename, delimiter=',', invalid_raise=False, skip_footer=1)
-    date_times = pd.to_datetime((data_m[:, 0] - data_m[0, 0]))
+    date_times = nanoseconds_to_datetime_index(data_m[:, 0] - data_m[0, 0])
     time_difference = (data_m[:, 0] - data_m[0, 0]) / convert_times
     data = {'td': time_difference, 'action_type': data_m[:, 2],'x': data_m[:, 3], 'y': data_m[:, 4],
             'x_target': data_m[:, 7], 'y_target': data_m[:, 8]}
@@ -309,7 +470,7 @@ def load_finger_tapping_opdc_data(filename, convert_times=1000000000.0):
     """
     data_m = np.genfromtxt(filename, delimiter=',', invalid_raise=False, skip_footer=1)
     data_m[:, 0] = data_m[:, 0] * 1000000000
-    date_times = pd.to_datetime((data_m[:, 0] - data_m[0, 0]))
+    date_times = nanoseconds_to_datetime_index(data_m[:, 0] - data_m[0, 0])
     time_difference = (data_m[:, 0] - data_m[0, 0]) / convert_times
     data = {'td': time_difference, 'x': data_m[:, 1], 'y': data_m[:, 2]}
     data['action_type'] = 1.0
@@ -347,7 +508,7 @@ def load_reaction_opdc_data(filename, convert_times=1000000000.0):
     """
     data_m = np.genfromtxt(filename, delimiter=',', invalid_raise=False, skip_footer=1)
     data_m[:, 0] = data_m[:, 0] * convert_times
-    date_times = pd.to_datetime((data_m[:, 0] - data_m[0, 0]))
+    date_times = nanoseconds_to_datetime_index(data_m[:, 0] - data_m[0, 0])
     time_difference = (data_m[:, 0] - data_m[0, 0]) / convert_times
     data = {'td': time_difference, 'x': data_m[:, 1], 'y': data_m[:, 2], 'bVis': data_m[:, 3]!= 0, 'bPres': data_m[:, 4]==1 }
     data_frame = pd.DataFrame(data, index=date_times, columns=['td', 'x', 'y', 'bVis', 'bPres'])
@@ -359,7 +520,8 @@ def load_finger_tapping_mpower_data(filename, button_left_rect, button_right_rec
         This method loads data in the `mpower <https://www.synapse.org/#!Synapse:syn4993293/wiki/247859>`_ format
     """
     raw_data = pd.read_json(filename)
-    date_times = pd.to_datetime(raw_data.TapTimeStamp * convert_times - raw_data.TapTimeStamp[0] * convert_times)
+    date_times = nanoseconds_to_datetime_index(raw_data.TapTimeStamp.values * convert_times -
+                                               raw_data.TapTimeStamp[0] * convert_times)
     time_difference = (raw_data.TapTimeStamp - raw_data.TapTimeStamp[0])
     time_difference = time_difference.values
     x = []
@@ -452,7 +614,7 @@ def load_data(filename, format_file='cloudupdrs', button_left_rect=None, button_
 
 def numerical_integration(signal, sampling_frequency):
     """
-        Numerically integrate a signal with it's sampling frequency.
+        Numerically integrate a signal with it's sampling frequency using the trapezoidal rule.
 
         :param signal: A 1-dimensional array or list (the signal).
         :type signal: array
@@ -462,12 +624,26 @@ def numerical_integration(signal, sampling_frequency):
         :rtype: numpy.ndarray
     """
 
-    integrate = sum(signal[1:]) / sampling_frequency + sum(signal[:-1])
-    integrate /= sampling_frequency * 2
+    signal = np.asarray(signal)
+    # fewer than two samples span no interval, np.trapz gives 0 for them too
+    if len(signal) < 2:
+        return np.array(0.0)
+
+    integrate = (0.5 * (signal[0] + signal[-1]) + np.add.reduce(signal[1:-1])) / sampling_frequency
 
     return np.array(integrate)
 
 
+def _float_dtype(data):
+    """
+        The floating point type to compute with for `data`: float32 and float64 inputs keep their precision (the
+        scipy.fft transforms run at that precision), anything else is promoted to float64.
+    """
+    dtype = np.asarray(data).dtype
+
+    return dtype if dtype in (np.float32, np.float64) else np.dtype(np.float64)
+
+
 def autocorrelation(signal):
     """
         The `correlation <https://en.wikipedia.org/wiki/Autocorrelation#Estimation>`_ of a signal with a delayed copy of itself.
@@ -478,15 +654,19 @@ def autocorrelation(signal):
         :rtype: numpy.ndarray
     """
 
-    signal = np.array(signal)
+    # work on a copy, it is de-meaned in place
+    signal = np.array(signal, dtype=_float_dtype(signal))
     n = len(signal)
     variance = signal.var()
     signal -= signal.mean()
 
-    r = np.correlate(signal, signal, mode = 'full')[-n:]
-    result = r / (variance * (np.arange(n, 0, -1)))
+    r = correlate(signal, signal, mode='full', method='fft')[-n:]
+    # build the divisor once and divide into it, so the result is its only allocation
+    result = np.arange(n, 0, -1, dtype=signal.dtype)
+    result *= variance
+    np.divide(r, result, out=result)
 
-    return np.array(result)
+    return result
 
 
 def peakdet(signal, delta, x=None):
@@ -506,51 +686,25 @@ def peakdet(signal, delta, x=None):
         :rtype mintab: numpy.ndarray
     """
 
-    maxtab = []
-    mintab = []
-
-    if x is None:
-        x = np.arange(len(signal))
-
-    v = np.asarray(signal)
+    v = np.ascontiguousarray(signal, dtype=np.float64)
 
-    if len(v) != len(x):
-        sys.exit('Input vectors v and x must have same length')
+    if x is not None and len(v) != len(x):
+        raise ValueError('Input vectors v and x must have same length')
 
     if not np.isscalar(delta):
-        sys.exit('Input argument delta must be a scalar')
+        raise ValueError('Input argument delta must be a scalar')
 
     if delta <= 0:
-        sys.exit('Input argument delta must be positive')
-
-    mn, mx = np.inf, -np.inf
-    mnpos, mxpos = np.nan, np.nan
-
-    lookformax = True
-
-    for i in np.arange(len(v)):
-        this = v[i]
-        if this > mx:
-            mx = this
-            mxpos = x[i]
-        if this < mn:
-            mn = this
-            mnpos = x[i]
-
-        if lookformax:
-            if this < mx - delta:
-                maxtab.append((mxpos, mx))
-                mn = this
-                mnpos = x[i]
-                lookformax = False
-        else:
-            if this > mn + delta:
-                mintab.append((mnpos, mn))
-                mx = this
-                mxpos = x[i]
-                lookformax = True
+        raise ValueError('Input argument delta must be positive')
+
+    maxtab, mintab = _peakdet_nb(v, float(delta))
 
-    return np.array(maxtab), np.array(mintab)
+    if x is not None:
+        x = np.asarray(x)
+        maxtab[:, 0] = x[maxtab[:, 0].astype(np.int64)]
+        mintab[:, 0] = x[mintab[:, 0].astype(np.int64)]
+
+    return maxtab, mintab
 
 
 def compute_interpeak(data, sample_rate):
@@ -574,11 +728,11 @@ def compute_interpeak(data, sample_rate):
     """
 
     # Real part of FFT:
-    freqs = fftfreq(data.size, d=1.0/sample_rate)
+    freqs = _fftfreq(data.size, sample_rate)
     f_signal = rfft(data)
 
-    # Maximum non-zero frequency:
-    imax_freq = np.argsort(f_signal)[-2]
+    # Maximum non-zero frequency (linear-time selection of the second largest coefficient):
+    imax_freq = np.argpartition(f_signal, -2)[-2]
     freq = np.abs(freqs[imax_freq])
 
     # Inter-peak samples:
@@ -587,11 +741,21 @@ def compute_interpeak(data, sample_rate):
     return interpeak
 
 
+@functools.lru_cache(maxsize=32)
+def _fftfreq(n, sample_rate):
+    """
+        Compute (and cache) the sample frequencies of an n point FFT, so that windows of the same size do not rebuild
+        them. The returned array is shared and must not be modified.
+    """
+    return fftfreq(n, d=1.0/sample_rate)
+
+
 def butter_lowpass_filter(data, sample_rate, cutoff=10, order=4, plot=False):
     """
         `Low-pass filter <http://stackoverflow.com/questions/25191620/
-        creating-lowpass-filter-in-scipy-understanding-methods-and-units>`_ data by the [order]th order zero lag Butterworth filter
-        whose cut frequency is set to [cutoff] Hz.
+        creating-lowpass-filter-in-scipy-understanding-methods-and-units>`_ data by the [order]th order Butterworth filter
+        whose cut frequency is set to [cutoff] Hz. The filter is designed and applied as cascaded second-order sections,
+        which is numerically stable for higher orders. It is causal, so the output lags the input.
 
         :param data: time-series data,
         :type data: numpy array of floats
@@ -618,10 +782,10 @@ def butter_lowpass_filter(data, sample_rate, cutoff=10, order=4, plot=False):
 
     nyquist = 0.5 * sample_rate
     normal_cutoff = cutoff / nyquist
-    b, a = butter(order, normal_cutoff, btype='low', analog=False)
+    sos = _butter_lowpass_sos(order, normal_cutoff)
 
     if plot:
-        w, h = freqz(b, a, worN=8000)
+        w, h = sosfreqz(sos, worN=8000)
         plt.subplot(2, 1, 1)
         plt.plot(0.5*sample_rate*w/np.pi, np.abs(h), 'b')
         plt.plot(cutoff, 0.5*np.sqrt(2), 'ko')
@@ -632,11 +796,122 @@ def butter_lowpass_filter(data, sample_rate, cutoff=10, order=4, plot=False):
         plt.grid()
         plt.show()
 
-    y = lfilter(b, a, data)
+    y = sosfilt(sos, data)
+
+    return y
+
+
+@functools.lru_cache(maxsize=64)
+def _butter_lowpass_sos(order, normal_cutoff):
+    """
+        Design (and cache) the second-order sections of a low-pass Butterworth filter, so that filtering many windows
+        with the same settings does not repeat the design. The returned array is shared and must not be modified.
+    """
+    return butter(order, normal_cutoff, btype='low', analog=False, output='sos')
+
+
+def butter_lowpass_filter_stream(data, sample_rate, cutoff=10, order=4, zi=None):
+    """
+        Low-pass filter one window of a longer signal with the same Butterworth filter as
+        :func:`butter_lowpass_filter`, carrying the filter state over to the next window.
+
+        Pass the returned state back in with the next window of the same signal, so consecutive windows are filtered
+        as one continuous signal. For the first window (zi=None) the filter starts in steady state for the first
+        sample rather than from rest, which avoids the start-up transient. An empty first window returns zi=None, so
+        the next window starts the filter instead.
+
+        :param data: one window of time-series data
+        :type data: numpy array of floats
+        :param: sample_rate: data sample rate
+        :type sample_rate: integer
+        :param cutoff: filter cutoff
+        :type cutoff: float
+        :param order: order
+        :type order: integer
+        :param zi: filter state returned by the previous window (None for the first window)
+        :type zi: numpy array of floats
+        :return y: low-pass-filtered window
+        :rtype y: numpy array of floats
+        :return zi: filter state to pass in with the next window
+        :rtype zi: numpy array of floats
+
+        :Examples:
+
+        >>> zi = None
+        >>> for window in windows:
+        ...     y, zi = butter_lowpass_filter_stream(window, sample_rate, cutoff, order, zi=zi)
+    """
+    nyquist = 0.5 * sample_rate
+    normal_cutoff = cutoff / nyquist
+    sos = _butter_lowpass_sos(order, normal_cutoff)
+
+    data = np.asarray(data)
+    if zi is None:
+        if len(data) == 0:
+            # no first sample to start from yet, leave that to the next window
+            return np.zeros(0), None
+        zi = _butter_lowpass_sos_zi(order, normal_cutoff) * data[0]
+
+    y, zi = sosfilt(sos, data, zi=zi)
+
+    return y, zi
+
+
+def batch_butter_lowpass_filter(data, sample_rate, cutoff=10, order=4):
+    """
+        Low-pass filter many channels at once with the same Butterworth filter as :func:`butter_lowpass_filter`,
+        in parallel across channels.
+
+        :param data: time-series data, one channel per row
+        :type data: 2-dimensional numpy array of floats
+        :param: sample_rate: data sample rate
+        :type sample_rate: integer
+        :param cutoff: filter cutoff
+        :type cutoff: float
+        :param order: order
+        :type order: integer
+        :return y: low-pass-filtered data, one channel per row
+        :rtype y: 2-dimensional numpy array of floats
+    """
+    nyquist = 0.5 * sample_rate
+    normal_cutoff = cutoff / nyquist
+    sos = _butter_lowpass_sos(order, normal_cutoff)
+
+    data = np.asarray(data, dtype=np.float64)
+    y = np.empty_like(data)
+    _batch_sosfilt_nb(sos, data, y)
 
     return y
 
 
+@njit(cache=True, parallel=True)
+def _batch_sosfilt_nb(sos, data, out):
+    """
+        Compiled core of :func:`batch_butter_lowpass_filter`. Runs the cascaded biquads (transposed direct form II,
+        as scipy.signal.sosfilt) from rest over each channel, one channel per thread.
+    """
+    n_sections = sos.shape[0]
+    for c in prange(data.shape[0]):
+        zi = np.zeros((n_sections, 2))
+        for i in range(data.shape[1]):
+            x_cur = data[c, i]
+            for s in range(n_sections):
+                x_new = sos[s, 0] * x_cur + zi[s, 0]
+                zi[s, 0] = sos[s, 1] * x_cur - sos[s, 4] * x_new + zi[s, 1]
+                zi[s, 1] = sos[s, 2] * x_cur - sos[s, 5] * x_new
+                x_cur = x_new
+            out[c, i] = x_cur
+
+
+@functools.lru_cache(maxsize=64)
+def _butter_lowpass_sos_zi(order, normal_cutoff):
+    """
+        Compute (and cache) the steady-state filter state of :func:`_butter_lowpass_sos` for a unit step input. The
+        returned array is shared and must not be modified.
+    """
+    return sosfilt_zi(_butter_lowpass_sos(order, normal_cutoff))
+
+
 def crossings_nonzero_pos2neg(data):
     """
         Find `indices of zero crossings from positive to negative values <http://stackoverflow.com/questions/3843017/efficiently-detect-sign-changes-in-python>`_.
@@ -665,7 +940,8 @@ def crossings_nonzero_pos2neg(data):
 
     pos = data > 0
 
-    crossings = (pos[:-1] & ~pos[1:]).nonzero()[0]
+    # on booleans a > b is a & ~b, without the temporary for ~b
+    crossings = np.greater(pos[:-1], pos[1:]).nonzero()[0]
 
     return crossings
 
@@ -673,7 +949,7 @@ def crossings_nonzero_pos2neg(data):
 def autocorrelate(data, unbias=2, normalize=2):
     """
         Compute the autocorrelation coefficients for time series data.
-        Here we use scipy.signal.correlate, but the results are the same as in
+        Here we use the power spectrum computed with scipy.fft, but the results are the same as in
         Yang, et al., 2012 for unbias=1:
 
 
@@ -716,31 +992,59 @@ def autocorrelate(data, unbias=2, normalize=2):
     """
 
     # Autocorrelation:
-    coefficients = correlate(data, data, 'full')
-    size = np.int(coefficients.size/2)
-    coefficients = coefficients[size:]
-    N = coefficients.size
+    # Only the non-negative lags are needed, so take them straight from the power spectrum
+    # of the zero padded signal instead of computing the full correlation:
+    data = np.ascontiguousarray(data)
+    data = data.astype(_float_dtype(data), copy=False)
+    N = len(data)
+    n_fft = spfft.next_fast_len(2 * N - 1)
+    f_data = spfft.rfft(data, n_fft)
+    f_data *= np.conj(f_data)
+    coefficients = spfft.irfft(f_data, n_fft)[:N]
+
+    if unbias not in (None, 0, 1, 2):
+        raise IOError("unbias should be set to 1, 2, or None")
+    if normalize not in (None, 0, 1, 2):
+        raise IOError("normalize should be set to 1, 2, or None")
+
+    # Unbias and normalize in place:
+    if unbias or normalize:
+        _unbias_normalize_nb(coefficients, unbias or 0, normalize or 0)
+
+    return coefficients, N
+
+
+@njit(cache=True, error_model='numpy')
+def _unbias_normalize_nb(coefficients, unbias, normalize):
+    """
+        Compiled core of the unbias and normalize steps of :func:`autocorrelate`. The unbiasing divisor is generated on
+        the fly while tracking the normalization factor, then a second sweep applies it, so no divisor arrays are
+        allocated. Divisions by zero give inf or NaN as with numpy arrays, e.g. for a flat signal.
+    """
+    N = coefficients.shape[0]
+
+    if unbias == 2:
+        start = coefficients[0] / coefficients[-1]
+        step = (1.0 - start) / (N - 1) if N > 1 else 0.0
 
-    # Unbiased:
-    if unbias:
+    norm = 0.0
+    for i in range(N):
         if unbias == 1:
-            coefficients /= (N - np.arange(N))
+            coefficients[i] /= N - i
         elif unbias == 2:
-            coefficient_ratio = coefficients[0]/coefficients[-1]
-            coefficients /= np.linspace(coefficient_ratio, 1, N)
-        else:
-            raise IOError("unbias should be set to 1, 2, or None")
+            # same values as np.linspace(start, 1, N)
+            coefficients[i] /= 1.0 if 0 < i == N - 1 else i * step + start
 
-    # Normalize:
-    if normalize:
-        if normalize == 1:
-            coefficients /= np.abs(coefficients[0])
-        elif normalize == 2:
-            coefficients /= np.max(np.abs(coefficients))
-        else:
-            raise IOError("normalize should be set to 1, 2, or None")
+        # np.max propagates NaN, so keep the first one
+        if normalize == 2 and not abs(coefficients[i]) <= norm and norm == norm:
+            norm = abs(coefficients[i])
 
-    return coefficients, N
+    if normalize == 1:
+        norm = abs(coefficients[0])
+
+    if normalize:
+        for i in range(N):
+            coefficients[i] /= norm
 
 
 def get_signal_peaks_and_prominences(data):
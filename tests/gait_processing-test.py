@@ -42,27 +42,27 @@ class GaitProcessingTest(unittest.TestCase):
                              1357, 1407, 1457, 1507, 1557, 1607, 1657, 1707, 1757, 1807, 1857,
                              1907, 1957, 2007, 2057, 2107, 2157, 2207, 2257, 2307]
         
-        self.freeze_indexes = round_to_two([0.66275233, 0.48494184, 0.5249604 , 0.49955592, 0.43975925,
-                                            0.38096038, 0.42747506, 0.35568315, 0.29876724, 0.3028857 ,
-                                            0.29365826, 0.29416978, 0.2934438 , 0.31991965, 0.3044721 ,
-                                            0.48086074, 0.6303387 , 0.64325756, 0.7543462 , 0.51056   ,
-                                            0.82259506, 0.58685344, 0.60540056, 0.33504343, 0.39846754,
-                                            0.32807222, 0.29868916, 0.30436054, 0.3181052 , 0.38775647,
-                                            0.46554214, 0.4651025 , 0.5032366 , 0.48541462, 0.5435754 ,
-                                            0.4435356 , 0.56342155, 0.33841345, 0.7144568 , 0.92833215,
-                                            3.0611734 , 2.1126976 ])
+        self.freeze_indexes = round_to_two([0.5547186 , 0.4337564 , 0.446064  , 0.49465778, 0.4236148 ,
+                                            0.3824837 , 0.415788  , 0.35417098, 0.29662856, 0.3036115 ,
+                                            0.28065264, 0.28007898, 0.2934273 , 0.3073825 , 0.29829404,
+                                            0.45017174, 0.52872103, 0.48344216, 0.67519176, 0.5249516 ,
+                                            0.76377004, 0.5083356 , 0.5435224 , 0.32593298, 0.3998995 ,
+                                            0.3213578 , 0.3051104 , 0.30644718, 0.31340468, 0.36348915,
+                                            0.456623  , 0.44260183, 0.49128172, 0.48768967, 0.5190448 ,
+                                            0.41566658, 0.5587564 , 0.24593645, 0.48260832, 0.78602135,
+                                            2.7015026 , 2.3261697 ])
         
-        self.locomotion_freezes = round_to_two([8.9955121e-01, 2.0360003e+00, 2.8336084e+00, 4.1309290e+00,
-                                                4.8003669e+00, 5.7900286e+00, 5.6657634e+00, 5.9355884e+00,
-                                                5.9315796e+00, 6.2054639e+00, 6.1077957e+00, 6.1818423e+00,
-                                                5.8416581e+00, 5.7142901e+00, 5.2229681e+00, 4.2915435e+00,
-                                                3.5569930e+00, 2.8637218e+00, 2.1925688e+00, 2.1188903e+00,
-                                                2.5527506e+00, 3.1371610e+00, 3.9612195e+00, 4.4408898e+00,
-                                                4.4523473e+00, 4.4430523e+00, 4.3213620e+00, 4.2383804e+00,
-                                                4.2852478e+00, 4.4170160e+00, 4.5098805e+00, 4.5359721e+00,
-                                                4.7111130e+00, 3.8320572e+00, 3.7665429e+00, 2.7708292e+00,
-                                                2.1944942e+00, 1.0180814e+00, 7.6819503e-01, 3.2823542e-01,
-                                                3.1221139e-03, 5.2019866e-04])
+        self.locomotion_freezes = round_to_two([1.8063681e+00, 4.0501418e+00, 5.6128888e+00, 8.1884928e+00,
+                                                9.5161467e+00, 1.1481883e+01, 1.1223180e+01, 1.1790969e+01,
+                                                1.1793433e+01, 1.2314683e+01, 1.2119089e+01, 1.2257837e+01,
+                                                1.1586128e+01, 1.1355243e+01, 1.0345661e+01, 8.5245991e+00,
+                                                7.1177068e+00, 5.7056813e+00, 4.5000906e+00, 4.2958159e+00,
+                                                5.1089778e+00, 6.2122073e+00, 7.8573475e+00, 8.8531256e+00,
+                                                8.8619041e+00, 8.8070602e+00, 8.5994911e+00, 8.4280119e+00,
+                                                8.5027285e+00, 8.7552862e+00, 8.9815140e+00, 9.0253563e+00,
+                                                9.3388968e+00, 7.6006756e+00, 7.4848866e+00, 5.4887376e+00,
+                                                4.3589497e+00, 2.0265284e+00, 1.5365496e+00, 6.5678424e-01,
+                                                6.2715821e-03, 1.1796515e-03])
 
         # Results for walk symmetry
         self.xyz_step_regularity = round_to_two([0.44895787870999526, 0.27681789027394327, 0.42835833214314395])
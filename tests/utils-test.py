@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright 2018 Birkbeck College. All rights reserved.
+#
+# Licensed under the MIT license. See file LICENSE for details.
+#
+# Author(s): J.S. Pons
+
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from scipy.signal import butter, sosfilt, sosfilt_zi
+
+from pdkit.processor import Processor
+from pdkit.utils import autocorrelate, batch_butter_lowpass_filter, batch_magnitude, butter_lowpass_filter, \
+    butter_lowpass_filter_stream, crossings_nonzero_pos2neg, magnitude, nanoseconds_to_datetime_index, \
+    numerical_integration, peakdet, read_csv_data
+
+
+class UtilsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_csv(self, content):
+        filename = os.path.join(self.tmp_dir, 'data.csv')
+        with open(filename, 'w') as f:
+            f.write(content)
+        return filename
+
+    def test_read_csv_data(self):
+        filename = self.write_csv('1,2,3,4\n'
+                                  '5,6,7\n'           # short row, skipped
+                                  '8,9,10,11,12\n'    # long row, skipped
+                                  '9,10,,12\n'        # empty field, kept as NaN
+                                  '13,14,15,16\n')
+        data = read_csv_data(filename)
+
+        np.testing.assert_array_equal(data, [[1, 2, 3, 4], [9, 10, np.nan, 12], [13, 14, 15, 16]])
+        np.testing.assert_array_equal(data, np.genfromtxt(filename, delimiter=',', invalid_raise=False))
+
+    def test_read_csv_data_non_numeric(self):
+        filename = self.write_csv('1,2,3,4\n'
+                                  'end\n'
+                                  '5,x,7,8\n'
+                                  '9,10,11,12\n'
+                                  'Total number of taps: 185\n')
+        data = read_csv_data(filename)
+
+        np.testing.assert_array_equal(data, [[1, 2, 3, 4], [5, np.nan, 7, 8], [9, 10, 11, 12]])
+        np.testing.assert_array_equal(data, np.genfromtxt(filename, delimiter=',', invalid_raise=False))
+
+    def test_read_csv_data_finger_tapping(self):
+        filename = './tests/data/finger_tapping_two_target_right_hand.csv'
+
+        np.testing.assert_array_equal(read_csv_data(filename),
+                                      np.genfromtxt(filename, delimiter=',', invalid_raise=False))
+
+    def test_autocorrelate_flat(self):
+        for unbias in (None, 1, 2):
+            for normalize in (1, 2):
+                coefficients, N = autocorrelate(np.zeros(10), unbias, normalize)
+
+                self.assertEqual(N, 10)
+                self.assertTrue(np.isnan(coefficients).all())
+
+        coefficients, N = autocorrelate(np.zeros(10), 2, None)
+
+        np.testing.assert_array_equal(coefficients, np.r_[np.full(9, np.nan), 0])
+
+    def test_batch_butter_lowpass_filter(self):
+        data = np.random.RandomState(0).randn(4, 500)
+
+        for order in (2, 4, 8):
+            filtered = batch_butter_lowpass_filter(data, 100.0, cutoff=5.0, order=order)
+
+            for channel, filtered_channel in zip(data, filtered):
+                np.testing.assert_allclose(filtered_channel,
+                                           butter_lowpass_filter(channel, 100.0, cutoff=5.0, order=order),
+                                           rtol=1e-12, atol=1e-12)
+
+    def test_filter_data_frame(self):
+        data_frame = pd.DataFrame(np.random.RandomState(1).randn(500, 3), columns=['x', 'y', 'z'])
+        data_frame['anno'] = np.arange(500) % 2
+
+        for order in (2, 4, 8):
+            filtered = Processor(cutoff_frequency=5.0, filter_order=order).filter_data_frame(data_frame)
+
+            self.assertListEqual(list(filtered.columns), ['x', 'y', 'z', 'anno'])
+            np.testing.assert_array_equal(filtered['anno'].values, data_frame['anno'].values)
+            for column in ['x', 'y', 'z']:
+                np.testing.assert_allclose(filtered[column].values,
+                                           butter_lowpass_filter(data_frame[column].values, 100.0, cutoff=5.0,
+                                                                 order=order),
+                                           rtol=1e-12, atol=1e-12)
+
+    def test_butter_lowpass_filter_stream(self):
+        x = np.random.RandomState(3).randn(1000)
+        sos = butter(4, 5.0 / (0.5 * 100.0), btype='low', output='sos')
+        expected, _ = sosfilt(sos, x, zi=sosfilt_zi(sos) * x[0])
+
+        for windows in (np.split(x, [0, 1, 100, 101, 500]), np.array_split(x, 7)):
+            zi = None
+            filtered = []
+            for window in windows:
+                y, zi = butter_lowpass_filter_stream(window, 100.0, cutoff=5.0, order=4, zi=zi)
+                filtered.append(y)
+
+            np.testing.assert_allclose(np.concatenate(filtered), expected, rtol=1e-12, atol=1e-12)
+
+    def test_butter_lowpass_filter_stream_empty(self):
+        y, zi = butter_lowpass_filter_stream(np.array([]), 100.0)
+
+        self.assertEqual(len(y), 0)
+        self.assertIsNone(zi)
+
+    def test_batch_magnitude(self):
+        xyz_batch = np.random.RandomState(2).randn(4, 3, 200)
+        magnitudes = batch_magnitude(xyz_batch)
+
+        self.assertEqual(magnitudes.shape, (4, 200))
+        for xyz, channel_magnitude in zip(xyz_batch, magnitudes):
+            np.testing.assert_allclose(channel_magnitude, magnitude(xyz.T), rtol=1e-15)
+            np.testing.assert_allclose(channel_magnitude, np.sqrt((xyz ** 2).sum(axis=0)), rtol=1e-15)
+
+    def test_crossings_nonzero_pos2neg(self):
+        # zero counts as non-positive
+        data = np.array([1.0, -1.0, 2.0, 0.0, 0.0, 3.0, 4.0, -2.0, 5.0])
+
+        np.testing.assert_array_equal(crossings_nonzero_pos2neg(data), [0, 2, 6])
+        np.testing.assert_array_equal(crossings_nonzero_pos2neg(list(data)), [0, 2, 6])
+        np.testing.assert_array_equal(crossings_nonzero_pos2neg(data.astype(int)), [0, 2, 6])
+        np.testing.assert_array_equal(crossings_nonzero_pos2neg(data > 0), [0, 2, 6])
+
+    def test_crossings_nonzero_pos2neg_short(self):
+        self.assertEqual(len(crossings_nonzero_pos2neg(np.array([]))), 0)
+        self.assertEqual(len(crossings_nonzero_pos2neg(np.array([1.0]))), 0)
+
+    def test_crossings_nonzero_pos2neg_2d(self):
+        data = np.array([[1.0, -1.0], [-1.0, 1.0], [2.0, -2.0]])
+
+        np.testing.assert_array_equal(crossings_nonzero_pos2neg(data), [0, 1])
+
+    def test_crossings_nonzero_pos2neg_invalid(self):
+        with self.assertRaises(IOError):
+            crossings_nonzero_pos2neg('data')
+
+    def test_nanoseconds_to_datetime_index(self):
+        offsets = np.array([0.0, 1.5e9, 2.7e9, 123456789.9])
+
+        pd.testing.assert_index_equal(nanoseconds_to_datetime_index(offsets), pd.to_datetime(offsets))
+        pd.testing.assert_index_equal(nanoseconds_to_datetime_index(offsets.astype(np.int64)),
+                                      pd.to_datetime(offsets.astype(np.int64)))
+
+    def test_nanoseconds_to_datetime_index_nan(self):
+        offsets = np.array([0.0, np.nan, 2e9])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            date_times = nanoseconds_to_datetime_index(offsets)
+
+        pd.testing.assert_index_equal(date_times, pd.to_datetime(offsets))
+        self.assertTrue(pd.isnull(date_times[1]))
+
+    def test_numerical_integration(self):
+        signal = np.array([1.0, 3.0, 2.0, 5.0, 4.0])
+
+        self.assertAlmostEqual(numerical_integration(signal, 100.0), np.trapz(signal, dx=1.0 / 100.0))
+
+    def test_numerical_integration_short(self):
+        self.assertEqual(numerical_integration([], 100.0), 0)
+        self.assertEqual(numerical_integration([5.0], 100.0), 0)
+
+    def test_peakdet(self):
+        maxtab, mintab = peakdet([1, 3, 0, 5, 0, 2], 1)
+
+        np.testing.assert_array_equal(maxtab, [[1, 3], [3, 5]])
+        np.testing.assert_array_equal(mintab, [[2, 0], [4, 0]])
+
+    def test_peakdet_nan(self):
+        maxtab, mintab = peakdet([1, np.nan, 3, 0, 5, 0, 2], 1)
+
+        np.testing.assert_array_equal(maxtab, [[2, 3], [4, 5]])
+        np.testing.assert_array_equal(mintab, [[3, 0], [5, 0]])
+
+    def test_peakdet_x(self):
+        maxtab, mintab = peakdet([1, 3, 0, 5, 0, 2], 1, x=[10, 11, 12, 13, 14, 15])
+
+        np.testing.assert_array_equal(maxtab, [[11, 3], [13, 5]])
+        np.testing.assert_array_equal(mintab, [[12, 0], [14, 0]])
+
+    def test_peakdet_invalid_delta(self):
+        with self.assertRaises(ValueError):
+            peakdet([1, 3, 0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()